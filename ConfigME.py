@@ -15,26 +15,77 @@ import os
 import platform
 import sys
 import subprocess
+import threading
+import asyncio
+import atexit
+import shutil
 
 from typing import Optional, Union, List, Tuple, Callable
 import re
 import inspect
 import importlib as il
+import importlib.abc
+import importlib.machinery
 import argparse
 
 import json
+import functools
+import collections
+import contextlib
+import types
+import hashlib
+import math
+import base64
+import fnmatch
+import sqlite3
 import datetime as dt
 import uuid
+import time
 import urllib.request as urlr
+import urllib.parse as urlparse
+import http.client
+import io
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 
 import dill as pickle
 import numpy as np
-from pathlib import PosixPath, Path
+from pathlib import PosixPath, Path, PurePath, PurePosixPath, PureWindowsPath
+
+_MISSING = object()
+_MAGIC = b'#ConfigME '
+_MAGIC_JSONL = b'{"ConfigME' # first record of .jsonl files, {"ConfigME": {header}}, as long as _MAGIC
+VOLATILE_KEYS = ('timestamp', 'savename', 'savename_config', 'envname')
+_CODECACHE = {} # compiled python-file configs {path : ((mtime_ns, size), code)}
+_STATELOCK = threading.Lock()
+
+class _State():
+    # bookkeeping of a config kept out of its __dict__, created on first use of digests, snapshots or thread-safe mode
+    __slots__ = ('digests', 'history', 'lock')
+    
+    def __init__(self) -> None:
+        self.digests = None # per-key digests, invalidated in Config.__setattr__
+        self.history = None # snapshot history, keys set since the last snapshot tracked in Config.__setattr__
+        self.lock = None # writer lock in thread-safe mode, see Config.threadsafe
 
 class Config():
     """
     The configuration class is the core functionality of the ConfigME package.
     """
+    __slots__ = ('__dict__', '__weakref__', '_cm_state')
+    
+    def __new__(cls, *args, **kwargs):
+        self = object.__new__(cls)
+        object.__setattr__(self, '_cm_state', None)
+        return self
+    
     #%% initialization
     def __init__(
         self,
@@ -106,15 +157,14 @@ class Config():
         dictl = self.get_dirs()
         dictl.update(self.get_modules())
         dictl.update(self.get_files())
+        changes = {}
         for key,value in dictl.items():
-            if type(value)==str:     
-                if not bequiet and '\\' in value:
+            value_ = _linuxify(value)
+            if value_ is not value:
+                if not bequiet:
                     print(f'linuxify {key} : {value}')
-                value = value.replace('\\','/')
-            elif type(value)==list:
-                value = [val.replace('\\','/') for val in value]
-                
-            self.__dict__.update({key:value})            
+                changes[key] = value_
+        self._apply(changes)
         pass
     
     #%% files
@@ -163,14 +213,16 @@ class Config():
         return importME(modules, bequiet=bequiet, setsyspath=setsyspath)
 
     #%% loading, saving...
-    def load(self, file:Optional[str]=None, linuxify:bool=True) -> None:
+    def load(self, file:Optional[str]=None, linuxify:bool=True, snapshot:bool=False) -> None:
         """
         Parameters
         ----------
         file : Optional[str], optional
-            Desired path to load the configuration class from. The default is None which uses the predefined name from init then.
+            Desired path or http(s) URL to load the configuration class from. The default is None which uses the predefined name from init then.
         linuxify : bool, optional
             Decider whether to linuxify the directories defined in the configuration. The default is True.
+        snapshot : bool, optional
+            Decider whether to snapshot python-file configs to <file>.dill and use it as long as the python-file is unchanged. The default is False.
 
         Returns
         -------
@@ -179,54 +231,78 @@ class Config():
         if not file:
             file = self.name
 
-        name,ext = os.path.splitext(file)
+        name,ext = os.path.splitext(urlparse.urlsplit(file).path if _isurl(file) else file) # query and fragment of URLs are no extension
         if ext==".py":
-            config_ = importME(name+".config")
+            config_ = loadME_py(fetchME(file) if _isurl(file) else file, snapshot=snapshot)
+            header = {}
         else:
-            with open(file, 'rb') as file_:
-                config_ = pickle.load(file_)
-        self.__class__ = config_.__class__
-        self.__dict__ = config_.__dict__
+            config_, header = _readME_header(file)
+        if linuxify and platform.system()!='Windows' and not header.get('normalized'): # paths of normalized configs are linux-style already
+            config_.linuxify(bequiet=True) # before publishing, so readers never see the unconverted paths
         
-        if linuxify and platform.system()!='Windows':
-            self.linuxify(bequiet=True)
+        with self._lock(): # class and contents are replaced in one critical section
+            if self.__class__ is not config_.__class__:
+                self.__class__ = config_.__class__
+            self.__dict__ = config_.__dict__
         pass
     
     @classmethod
-    def LOAD(cls, file:str, linuxify:bool=True) -> Config: ### TODO: TYPING
+    def LOAD(cls, file:str, linuxify:bool=True, snapshot:bool=False, keys:Optional[List[str]]=None) -> Config: ### TODO: TYPING
         """
         Parameters
         ----------
         file : str
-            Path to desired configuration file to be loaded.
+            Path or http(s) URL to desired configuration file to be loaded. URLs are cached on disk and revalidated on every load.
         linuxify : bool, optional
             Decider whether to linuxify the directories defined in the configuration. The default is True.
+        snapshot : bool, optional
+            Decider whether to snapshot python-file configs to <file>.dill and use it as long as the python-file is unchanged. The default is False.
+        keys : Optional[List[str]], optional
+            Keys to be loaded, also as patterns like 'dir_*'. Configs saved as .jsonl only read the requested records. The default is None which loads all keys.
 
         Returns
         -------
         Config
             Configuration class.
         """
-        name,ext = os.path.splitext(file)
+        name,ext = os.path.splitext(urlparse.urlsplit(file).path if _isurl(file) else file) # query and fragment of URLs are no extension
         if ext==".py":
-            config_ = importME(name+".config")
+            config_ = loadME_py(fetchME(file) if _isurl(file) else file, snapshot=snapshot)
+            if keys is not None:
+                config_.__dict__ = {key:config_.__dict__[key] for key in _matchkeys(config_.__dict__, keys)}
+            header = {}
         else:
-            with open(file, 'rb') as file_:
-                config_ = pickle.load(file_)
+            config_, header = _readME_header(file, keys=keys)
         
-        if linuxify and platform.system()!='Windows':
+        if linuxify and platform.system()!='Windows' and not header.get('normalized'): # paths of normalized configs are linux-style already
             config_.linuxify(bequiet=True)
             
         return config_
     
-    def save(self, savename:Optional[str]=None, bequiet:bool=False) -> str:
+    def save(self, savename:Optional[str]=None, bequiet:bool=False, fingerprint:bool=True, catalog:Optional[ConfigCatalog]=None, store:Optional[ConfigStore]=None, background:bool=False, normalize:bool=True, header:bool=True) -> str:
         """
         Parameters
         ----------
         savename : Optional[str], optional
             Desired path to save configuration class with. The default is None which uses the predefined savename_config then.
+            A .jsonl extension saves as JSON lines (header, one record per key, index) which supports loading selected keys, dill is used only for values not representable in JSON.
         bequiet : bool, optional
             Decider whether to ouput or not. The default is False.
+        fingerprint : bool, optional
+            Decider whether to store the per-key digests and the fingerprint in the file header. The default is True.
+        catalog : Optional[ConfigCatalog], optional
+            Catalog to be updated with the saved file. The default is None.
+        store : Optional[ConfigStore], optional
+            Content-addressed store the values are written to, the file then is a small manifest of key->digest. The default is None.
+        background : bool, optional
+            Decider whether to write on a background thread. Successive saves to the same file not written yet are coalesced into one write, use flush() to wait for them. The default is False.
+        normalize : bool, optional
+            Decider whether to store the directories, files and modules linuxified and mark the file as normalized, so loading skips linuxify. The config itself is not changed.
+            Windows path objects (PureWindowsPath, WindowsPath) are stored as PurePosixPath, so the file can be loaded on any platform. The default is True.
+        header : bool, optional
+            Decider whether to start the file with the ConfigME header line (#ConfigME {json}) holding the fingerprint, platform and normalization marker.
+            Files with header cannot be read by ConfigME versions before the header was introduced or by plain dill.load, header=False writes the bare dill pickle as before
+            (without fingerprint and normalization then). The .jsonl format and stores always need the header. The default is True.
 
         Returns
         -------
@@ -238,14 +314,67 @@ class Config():
         else:
             file = savename
 
-        with open(file, 'wb') as outfile:
-            pickle.dump(self, outfile, pickle.HIGHEST_PROTOCOL)
+        path = os.path.abspath(file) # resolved now, a background write must not depend on the working directory at writing
+        jsonl = os.path.splitext(file)[1]=='.jsonl'
+        if not header and (store is not None or jsonl):
+            raise ValueError('Config.save: the .jsonl format and stores need the header!')
+        
+        if header:
+            header_ = self._header(fingerprint=fingerprint, platform=platform.system(), normalized=normalize)
+            changes = self._normalized() if normalize else {}
+        else:
+            header_ = None
+            changes = {}
+        config_ = self
+        if background or changes: # shallow copy so the file reflects the state at calling save
+            cls = type(self)
+            config_ = cls.__new__(cls)
+            object.__setattr__(config_, '__dict__', dict(self.__dict__, **changes))
+            if fingerprint and changes:
+                header_['digests'].update({key:_digest(value) for key,value in changes.items()})
+                header_['fingerprint'] = _merkle(header_['digests'])
+        
+        def write():
+            with atomicME(path, 'wb') as outfile:
+                if header_ is None:
+                    pickle.dump(config_, outfile, pickle.HIGHEST_PROTOCOL)
+                elif store is not None:
+                    store.write(outfile, config_, header_, manifest=path)
+                elif jsonl:
+                    _writeME_jsonl(outfile, config_, header_)
+                else:
+                    _writeME(outfile, config_, header_)
+            if catalog is not None:
+                catalog.add(path, config=config_)
+        
+        if background:
+            _WRITER.submit(path, write)
+        else:
+            _WRITER.discard(path) # an older background save must not overwrite this one afterwards
+            write()
 
         if not bequiet:
             print(f"{file} protocol: {pickle.HIGHEST_PROTOCOL}")
 
         return file
     
+    def flush(self, timeout:Optional[float]=None) -> None:
+        '''
+        Waits until all background saves are written, see save(background=True).
+        '''
+        flushME(timeout=timeout)
+    
+    def watch(self, file:Optional[str]=None, interval:float=1.0, start:bool=True) -> ConfigWatcher:
+        '''
+        :param file: Path to the configuration file to be watched. The default is None which uses savename_config then.
+        :param interval: Polling interval in seconds.
+        :param start: Decider whether to start polling in a background thread right away.
+        '''
+        watcher = ConfigWatcher(self, file=file, interval=interval)
+        if start:
+            watcher.start()
+        return watcher
+    
     def saveGIT(self, savename=None):
         raise NotImplementedError("Config.saveGIT not implemented yet!")
     
@@ -305,10 +434,9 @@ class Config():
             if type(mode)==str:
                 contents.insert(0,'### Made with ConfigME by Michael Engel! ###\n')
             
-            with open(outfile,'w') as file_:
+            with atomicME(outfile,'w') as file_:
                 contents = "".join(contents)
                 file_.write(contents)
-                file_.close()
         return True
     
     def parse_args(self,files=None,mode=1): ### TODO: expand towards args; currently kwargs only
@@ -393,32 +521,10 @@ class Config():
                 index=index-1
                 contents.pop(index) 
             
-            # change contents
-            for idx,attributekeyvalue in enumerate(zip(attributes,keys,values)):
-                attribute, key, value = attributekeyvalue
-                for i, content in enumerate(contents):
-                    # looking for the line in file to insert the args and default values
-                    if ((f'config.{attribute}' in content or f'config["{attribute}"]' in content or f"config['{attribute}']" in content) and not content.strip().startswith('#')) or type(mode)==str:
-                        # replace original string by dictionary definition relying on the queried arguments and their default values
-                        params_string = ''.join(['{\n']+[f"""\t"{key_}":config['{'_'.join([attribute,key_])}'],\n""" for key_ in key]+['}'])
-                        contents[i] = f"\nconfig.{attribute} = {params_string}\n"
-                        
-                        # insert arguments and their default values if available
-                        contents.insert(i+1, "\n")
-                        for key_,value_ in zip(key[::-1],value[::-1]):
-                            contents.insert(i, f"config.{'_'.join([attribute,key_])} = {value_ if value_=='' else str(value_)+' # think of changing this default value!'}\n")
-                        contents.insert(i,f"# params for {attribute}\n")
-                        
-                        if type(mode)==str:
-                            contents.insert(i,'### Made with ConfigME by Michael Engel! ###\n')
-                            
-                        break # necessary as going on forever otherwise
-            
-            # write changed contents to file
-            with open(outfile,'w') as file_:
-                contents = "".join(contents)
-                file_.write(contents)
-                file_.close()
+            # change contents in a single pass and write them to file
+            contents = _rewrite_args(contents, attributes, keys, values, header=type(mode)==str)
+            with atomicME(outfile,'w') as file_:
+                file_.writelines(contents)
             
             return True
     
@@ -479,10 +585,9 @@ class Config():
             if type(mode)==str:
                 contents.insert(0,'### Made with ConfigME by Michael Engel! ###\n')
             
-            with open(outfile,'w') as file_:
+            with atomicME(outfile,'w') as file_:
                 contents = "".join(contents)
                 file_.write(contents)
-                file_.close()
         return True
     
     #%% environment stuff
@@ -660,30 +765,19 @@ class Config():
     #%% dictionary like methods
     def update(self,*args,**kwargs): # one positional argument for loading a file and overwriting everything which is provided in the json-file given, keyword arguments for normal update as known for dictionaries
         if len(args)==1 and len(kwargs)==0:
-            with open(*args, 'rb') as file_:
-                model_ = pickle.load(file_)
-            configdict = model_.__dict__
-            keys = list(configdict.keys())
-            values = list(configdict.values())
-            for i in range(len(keys)):
-                self.__setattr__(keys[i],values[i])
+            model_ = _readME(*args)
+            self._apply(model_.__dict__)
             pass
         elif len(args)==0:
-            for key, value in kwargs.items():
-                self.__setattr__(key, value)
+            self._apply(kwargs)
             pass
         else:
             raise RuntimeError('Config.update: One positional argument XOR multiple keywordarguments!')
     
     def extend(self,file): # same as self.update but WITHOUT overwriting name, savename, timestamp and savename_config, could be used to overwrite hardware-specific settings using a predefined config_hardware-file e.g. ### TODO: find a better name!
-        with open(file, 'rb') as file_:
-            model_ = pickle.load(file_)
+        model_ = _readME(file)
         configdict = model_.__dict__
-        keys = list(configdict.keys())
-        values = list(configdict.values())
-        for i in range(len(keys)):
-            if keys[i]!='name' and keys[i]!='savename' and keys[i]!='timestamp' and keys[i]!='savename_config':
-                self.__setattr__(keys[i],values[i])
+        self._apply({key:value for key,value in configdict.items() if key!='name' and key!='savename' and key!='timestamp' and key!='savename_config'})
         pass
     
     def join(self,files,priority='old'):
@@ -692,29 +786,202 @@ class Config():
         elif type(files)==str:
             files = [files]
         
-        dictlist = []
-        for file in files:
-            with open(file, 'rb') as file_:
-                model_ = pickle.load(file_)
-            dictlist.append(model_.__dict__)
-          
-        if priority=='new':
-            dictlist.insert(0,self.__dict__)
-        elif priority=='old':
-            dictlist = dictlist[::-1]
-            dictlist.append(self.__dict__)
-        elif (type(priority)==list or type(priority)==np.ndarray) and len(priority)==len(files)+1:
-            dictlist.insert(0,self.__dict__)
-            dictlist = list(np.array(dictlist)[priority])
-        else:
-            print('Config.join: wrong priority given! If a list is given, note that the length has to be len(files)+1 as the joining config has to be taken into account as well!')
-        
-        configdict = {}
-        for dictl in dictlist:
-            configdict.update(dictl)
-        self.__dict__ = configdict
+        dictlist = [model_.__dict__ for model_ in _readMEs(files)] # read before taking the lock
+        
+        with self.transaction() as state: # merged with the current state, so concurrent writes are not lost
+            current = dict(state)
+            if priority=='new':
+                dictlist.insert(0,current)
+            elif priority=='old':
+                dictlist = dictlist[::-1]
+                dictlist.append(current)
+            elif (type(priority)==list or type(priority)==np.ndarray) and len(priority)==len(files)+1:
+                dictlist.insert(0,current)
+                dictlist = list(np.array(dictlist)[priority])
+            else:
+                print('Config.join: wrong priority given! If a list is given, note that the length has to be len(files)+1 as the joining config has to be taken into account as well!')
+            
+            configdict = {}
+            for dictl in dictlist:
+                configdict.update(dictl)
+            state.clear()
+            state.update(configdict)
         pass
     
+    #%% fingerprints
+    def digests(self, keys:Optional[List[str]]=None, fresh:bool=False) -> dict:
+        '''
+        Stable per-key digests which are cached and only recomputed for keys set since the last call.
+        Note that in-place changes of mutable values (e.g. config.params['lr'] = 1) are not tracked; use fresh=True or refresh_digests() then.
+        Digests are stable across processes for None, bool, int, float, complex, str, bytes, paths, numpy arrays, lists, tuples, dicts, sets
+        and objects whose state (__getstate__ or __dict__) consists of those. Other values, e.g. functions, are digested via their pickle.
+        :param fresh: Decider whether to recompute the digests of all mutable values, e.g. dicts, lists or arrays. save() always does so.
+        '''
+        state = self._state()
+        if state.digests is None:
+            state.digests = {}
+        cache = state.digests
+        if keys is None:
+            keys = self.__dict__.keys()
+        out = {}
+        for key in keys:
+            if key not in cache or (fresh and not _immutable(self.__dict__[key])):
+                cache[key] = _digest(self.__dict__[key])
+            out[key] = cache[key]
+        return out
+    
+    def refresh_digests(self) -> None:
+        state = getattr(self, '_cm_state', None)
+        if state is not None:
+            state.digests = None
+    
+    def fingerprint(self, ignore_volatile:bool=False, ignore:Optional[List[str]]=None) -> str:
+        '''
+        :param ignore_volatile: Decider whether to ignore keys changing with every instantiation, i.e. VOLATILE_KEYS.
+        :param ignore: Further keys to be ignored.
+        :return: Merkle-style root of the per-key digests.
+        '''
+        return _merkle(self.digests(), _ignored(ignore_volatile, ignore))
+    
+    def same_as(self, other:Union[Config,str], ignore_volatile:bool=True) -> bool:
+        '''
+        Compares against another config or a saved file. Files are compared by their header only if it contains the fingerprint.
+        '''
+        if isinstance(other, Config):
+            return self.fingerprint(ignore_volatile=ignore_volatile)==other.fingerprint(ignore_volatile=ignore_volatile)
+        return self.fingerprint(ignore_volatile=ignore_volatile)==fingerprintME(other, ignore_volatile=ignore_volatile)
+    
+    #%% thread safety
+    def threadsafe(self, enable:bool=True) -> Config:
+        '''
+        In thread-safe mode, writers never change the published key map in place but replace it atomically by an updated copy under a lock (copy-on-write).
+        Hence, readers in other threads need no lock and always see either the old or the new state, but never a half-applied update.
+        Use transaction() to apply several changes at once and view() for a consistent read-only view of several keys.
+        '''
+        state = self._state()
+        with _STATELOCK:
+            if enable and state.lock is None:
+                state.lock = threading.RLock()
+            elif not enable:
+                state.lock = None
+        return self
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        '''
+        Yields a copy of the key map which is published as one atomic change when the with-block is left without error:
+            with config.transaction() as state:
+                state['lr'] = 1e-3
+                del state['momentum']
+        '''
+        with self._lock():
+            old = self.__dict__
+            state = dict(old)
+            yield state
+            object.__setattr__(self, '__dict__', state)
+            for key in set(old)|set(state):
+                if old.get(key, _MISSING) is not state.get(key, _MISSING):
+                    self._touch(key)
+    
+    def view(self) -> types.MappingProxyType:
+        '''
+        Read-only view of the current key map. In thread-safe mode, it is a consistent snapshot not affected by later writes.
+        '''
+        return types.MappingProxyType(self.__dict__)
+    
+    #%% snapshots
+    def snapshot(self, label:Optional[str]=None, maxlen:Optional[int]=None) -> ConfigSnapshot:
+        '''
+        Takes a snapshot storing only the keys set or deleted since the previous snapshot, values are shared and not copied.
+        Hence, reassign values instead of changing them in place (config.params = {...} instead of config.params['lr'] = 1).
+        :param label: Optional label of the snapshot.
+        :param maxlen: Maximum number of snapshots kept in the history, the oldest ones are evicted. The default is None which keeps the current setting (16 initially).
+        '''
+        state = self._state()
+        if state.history is None:
+            state.history = _History()
+        history = state.history
+        if maxlen is not None:
+            history.maxlen = maxlen
+        
+        if not history.snapshots or history.dirty is None:
+            snapshot = ConfigSnapshot(None, dict(self.__dict__), (), label)
+        else:
+            snapshot = ConfigSnapshot(
+                history.snapshots[-1],
+                {key:self.__dict__[key] for key in history.dirty if key in self.__dict__},
+                tuple(key for key in history.dirty if key not in self.__dict__),
+                label
+            )
+        history.dirty = set()
+        history.snapshots.append(snapshot)
+        history.evict()
+        return snapshot
+    
+    def restore(self, snapshot:Union[ConfigSnapshot,int]=-1) -> None:
+        '''
+        :param snapshot: Snapshot or its index in the history. The default is -1 which restores the latest snapshot.
+        '''
+        if type(snapshot)==int:
+            snapshot = self.history()[snapshot]
+        state = snapshot.state()
+        with self.transaction() as current:
+            current.clear()
+            current.update(state)
+        
+        history = getattr(self, '_cm_state', None) and self._cm_state.history
+        if history is not None and history.snapshots:
+            latest = history.snapshots[-1].state()
+            history.dirty = {key for key in set(latest)|set(state) if latest.get(key, _MISSING) is not state.get(key, _MISSING)}
+    
+    def diff(self, old:Union[ConfigSnapshot,int]=-1, new:Optional[Union[ConfigSnapshot,int]]=None) -> dict:
+        '''
+        :param old: Snapshot or its index in the history. The default is -1 which is the latest snapshot.
+        :param new: Snapshot or its index in the history. The default is None which is the current state.
+        :return: Changed keys as {key : (old, new)}, missing values are given as None.
+        '''
+        history = self.history()
+        old = (history[old] if type(old)==int else old).state()
+        new = self.__dict__ if new is None else (history[new] if type(new)==int else new).state()
+        changes = {}
+        for key in list(old)+[key for key in new if key not in old]:
+            if key not in old or key not in new or not _equal(old[key], new[key]):
+                changes[key] = (old.get(key), new.get(key))
+        return changes
+    
+    def history(self) -> List[ConfigSnapshot]:
+        state = getattr(self, '_cm_state', None)
+        history = state.history if state is not None else None
+        return list(history.snapshots) if history is not None else []
+    
+    #%% path access
+    def get_path(self, path:str, default=_MISSING):
+        '''
+        :param path: Dotted path into the config, e.g. 'model_params.optimizer.lr'. The first part is the attribute, the rest are keys of nested dicts (or attributes/indices of nested objects).
+        :param default: Value returned if the path cannot be resolved. If not given, a KeyError is raised.
+        '''
+        try:
+            return getME_accessor(path)(self)
+        except (KeyError, AttributeError, IndexError, TypeError):
+            if default is _MISSING:
+                raise KeyError(f'Config.get_path: {path} not found!')
+            return default
+    
+    def get_many(self, paths:List[str], default=_MISSING) -> tuple:
+        return tuple(self.get_path(path, default=default) for path in paths)
+    
+    def freeze(self, path:Optional[str]=None) -> dict:
+        '''
+        Flattens the subtree at path (or the whole config if None) into a dictionary {dotted path : leaf value} for fast lookups in hot loops.
+        Note that this is a copy, i.e. later changes to the config are not reflected!
+        '''
+        if path:
+            return _flatten(self.get_path(path), path)
+        flat = {}
+        for key,value in self.__dict__.items():
+            flat.update(_flatten(value, key))
+        return flat
+    
     #%% utils ### TODO: Keep or remove?
     def getME_uniquename(self, ending:str='') -> str:
         uniquename = str(uuid.uuid4())+ending
@@ -732,10 +999,48 @@ class Config():
     
     def __setitem__(self,key,value):
         return setattr(self,key,value)
-
+    
     def __call__(self,file):
         self.load(file)
         pass
+    
+    def __setattr__(self,key,value):
+        try:
+            state = self._cm_state
+        except AttributeError: # created without __new__
+            state = None
+        if state is None: # plain configs pay for this check only
+            object.__setattr__(self,key,value)
+            return
+        lock = state.lock
+        if lock is None:
+            object.__setattr__(self,key,value)
+        elif key.startswith('__'):
+            with lock:
+                object.__setattr__(self,key,value)
+        else:
+            with lock:
+                state = dict(self.__dict__)
+                state[key] = value
+                object.__setattr__(self,'__dict__',state)
+        self._touch(key)
+    
+    def __delattr__(self,key):
+        state = getattr(self, '_cm_state', None)
+        lock = state.lock if state is not None else None
+        if lock is None:
+            object.__delattr__(self,key)
+        else:
+            with lock:
+                state = dict(self.__dict__)
+                if key not in state:
+                    raise AttributeError(key)
+                del state[key]
+                object.__setattr__(self,'__dict__',state)
+        self._touch(key)
+    
+    def __getstate__(self): # pickle the keys only, as before
+        return self.__dict__
 
     def __str__(self):
         return f'\nConfiguration File {self.savename}\n'+self._dict2str(self.__dict__)
@@ -744,6 +1049,71 @@ class Config():
         return len(self.__dict__)
     
     #%% hidden functions
+    def _header(self, fingerprint:bool=True, **kwargs) -> dict:
+        cls = type(self)
+        header = {'protocol':pickle.HIGHEST_PROTOCOL, 'class':f'{cls.__module__}:{cls.__qualname__}'}
+        if fingerprint:
+            if getattr(self, '_cm_state', None) is None: # without a digest cache, nothing to be reused or kept
+                header['digests'] = {key:_digest(value) for key,value in self.__dict__.items()}
+            else:
+                header['digests'] = self.digests(fresh=True)
+            header['fingerprint'] = _merkle(header['digests'])
+        header.update(kwargs)
+        return header
+    
+    def _normalized(self) -> dict:
+        # linuxified values of all directories, files and modules which are not linux-style yet, Windows paths as PurePosixPath
+        changes = {}
+        for key,value in self.__dict__.items():
+            if 'dir' in key.split('_') or 'file' in key.split('_') or 'module' in key.split('_'):
+                value_ = _linuxify(value, windows=True)
+                if value_ is not value:
+                    changes[key] = value_
+        return changes
+    
+    def _state(self) -> _State:
+        state = getattr(self, '_cm_state', None)
+        if state is None:
+            with _STATELOCK:
+                state = getattr(self, '_cm_state', None)
+                if state is None:
+                    state = _State()
+                    object.__setattr__(self, '_cm_state', state)
+        return state
+    
+    def _lock(self):
+        state = getattr(self, '_cm_state', None)
+        if state is None or state.lock is None:
+            return contextlib.nullcontext()
+        return state.lock
+    
+    def _touch(self, key:str) -> None:
+        # invalidate cached digests and mark key for the next snapshot
+        state = getattr(self, '_cm_state', None)
+        if state is None:
+            return
+        cache = state.digests
+        if cache is not None:
+            if key.startswith('__'): # __dict__ or __class__ replaced, e.g. by load or join
+                cache.clear()
+            else:
+                cache.pop(key, None)
+        history = state.history
+        if history is not None and history.dirty is not None:
+            if key.startswith('__'):
+                history.dirty = None
+            else:
+                history.dirty.add(key)
+    
+    def _apply(self, changes:dict) -> None:
+        state = getattr(self, '_cm_state', None)
+        if state is not None and state.lock is not None:
+            with self.transaction() as state:
+                state.update(changes)
+        else:
+            for key,value in changes.items():
+                self.__setattr__(key,value)
+    
     def _get_dict(self, buzzword:str) -> dict:
         outdict = {}
         for key,value in self.__dict__.items():
@@ -794,6 +1164,737 @@ class Config():
     def _checkmodule(self, module): ### TODO: TYPING
         return self.importME(module)
 
+#%% snapshots
+class ConfigSnapshot():
+    """
+    Persistent snapshot of the keys of a config, storing only the keys changed compared to its parent snapshot.
+    """
+    __slots__ = ('parent', 'delta', 'deleted', 'label', 'timestamp')
+    
+    def __init__(self, parent:Optional[ConfigSnapshot], delta:dict, deleted:tuple, label:Optional[str]=None) -> None:
+        self.parent = parent
+        self.delta = delta
+        self.deleted = deleted
+        self.label = label
+        self.timestamp = dt.datetime.now().strftime("%Y-%m-%dT%H-%M-%S-%f")
+    
+    def state(self) -> dict:
+        chain = []
+        snapshot = self
+        while snapshot is not None:
+            chain.append(snapshot)
+            snapshot = snapshot.parent
+        state = {}
+        for snapshot in chain[::-1]:
+            state.update(snapshot.delta)
+            for key in snapshot.deleted:
+                state.pop(key, None)
+        return state
+    
+    def __getitem__(self, key):
+        snapshot = self
+        while snapshot is not None:
+            if key in snapshot.delta:
+                return snapshot.delta[key]
+            if key in snapshot.deleted:
+                break
+            snapshot = snapshot.parent
+        raise KeyError(key)
+    
+    def __repr__(self):
+        return f'ConfigSnapshot({self.label if self.label else self.timestamp}, {len(self.delta)} changed keys)'
+
+class _History():
+    def __init__(self, maxlen:int=16) -> None:
+        self.maxlen = maxlen
+        self.snapshots = []
+        self.dirty = None # keys set since the latest snapshot, None if everything has to be stored
+    
+    def evict(self) -> None:
+        while len(self.snapshots)>max(self.maxlen, 1):
+            evicted = self.snapshots.pop(0)
+            oldest = self.snapshots[0]
+            if oldest.parent is not evicted or evicted.parent is not None:
+                continue
+            # the delta of the new oldest snapshot is folded into the full state of the evicted one, which in turn becomes
+            # the reverse delta on top of it, so the evicted snapshot stays valid for anyone holding it (O(changed keys))
+            base = evicted.delta
+            undo = {key:base[key] for key in list(oldest.delta)+list(oldest.deleted) if key in base}
+            added = tuple(key for key in oldest.delta if key not in base)
+            for key in oldest.deleted:
+                base.pop(key, None)
+            base.update(oldest.delta)
+            oldest.parent, oldest.delta, oldest.deleted = None, base, ()
+            evicted.parent, evicted.delta, evicted.deleted = oldest, undo, added
+
+#%% hot reload
+class ConfigWatcher():
+    """
+    Polls the stat of a configuration file and reloads the config only if the file has changed.
+    Callbacks subscribed to a key are called with (key, old value, new value) for every changed key.
+    Added and removed keys are given ConfigWatcher.MISSING as old and new value, respectively.
+    """
+    MISSING = _MISSING
+    
+    def __init__(
+        self,
+        config: Config,
+        file: Optional[str] = None,
+        interval: float = 1.0,
+        linuxify: bool = True
+    ) -> None:
+        self.config = config
+        self.file = file if file else config.savename_config
+        self.interval = interval
+        self.linuxify = linuxify
+        self.callbacks = {}
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def subscribe(self, key:Optional[str], callback:Callable) -> None:
+        '''
+        :param key: Key to be watched. None subscribes to all keys.
+        :param callback: Function called as callback(key, old, new).
+        '''
+        self.callbacks.setdefault(key, []).append(callback)
+    
+    def unsubscribe(self, key:Optional[str], callback:Callable) -> None:
+        if callback in self.callbacks.get(key, []):
+            self.callbacks[key].remove(callback)
+    
+    def check(self) -> dict:
+        '''
+        Reloads the config if the stat of the file changed and returns the changed keys as {key : (old, new)}.
+        Added keys get the old value and removed keys the new value ConfigWatcher.MISSING.
+        '''
+        signature = self._stat()
+        if signature==self._signature or signature is None:
+            return {}
+        
+        try:
+            config_ = Config.LOAD(self.file, linuxify=self.linuxify)
+        except Exception as e: # file might be written right now, so retry with the next poll
+            print(f'ConfigWatcher.check: reloading {self.file} failed! {e}')
+            return {}
+        self._signature = signature
+        
+        new = config_.__dict__
+        changes = {}
+        with self.config.transaction() as state: # readers see either the old or the completely reloaded config
+            for key in set(state)|set(new):
+                value_old = state.get(key, _MISSING)
+                value_new = new.get(key, _MISSING)
+                if not _equal(value_old, value_new):
+                    changes[key] = (value_old, value_new)
+            
+            for key,(value_old,value_new) in changes.items():
+                if value_new is _MISSING:
+                    del state[key]
+                else:
+                    state[key] = value_new
+        
+        for key,(value_old,value_new) in changes.items():
+            for callback in self.callbacks.get(key, [])+self.callbacks.get(None, []):
+                try:
+                    callback(key, value_old, value_new)
+                except Exception as e:
+                    print(f'ConfigWatcher.check: callback for {key} failed! {e}')
+        return changes
+    
+    def start(self) -> ConfigWatcher:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f'ConfigWatcher-{self.file}', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self, timeout:Optional[float]=None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    async def run_async(self) -> None:
+        '''
+        Polls within an asyncio event loop, e.g. asyncio.create_task(watcher.run_async()). Cancel the task to stop.
+        The blocking check (stat, reload and callbacks) runs in the default executor of the loop, i.e. callbacks are called from a worker thread.
+        '''
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            await loop.run_in_executor(None, self.check)
+            await asyncio.sleep(self.interval)
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+    
+    def _stat(self) -> Optional[Tuple[int,int,int]]:
+        try:
+            stat = os.stat(self.file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+#%% content-addressed store
+class ConfigStore():
+    """
+    Content-addressed store for the values of saved configs. Every value is serialized with dill and written once
+    to <directory>/blobs/<digest[:2]>/<digest>, so saved configs only are manifests of key->digest.
+    Blobs are keyed on the canonical digest of their value (see Config.digests), so equal values deduplicate across processes
+    although their pickles might differ, e.g. by set order.
+    Writing and garbage collection are serialized by the lock file <directory>/.lock, also across processes.
+    """
+    GRACE = 3600 # seconds blobs and registry entries are kept by gc although unreferenced, e.g. while a manifest is still being written
+    
+    def __init__(self, directory:str, create:bool=True) -> None:
+        '''
+        :param create: Decider whether to create the directory if missing, reading manifests does not.
+        '''
+        self.directory = os.path.abspath(directory)
+        self.registry = os.path.join(self.directory, 'manifests.txt')
+        if create:
+            os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+    
+    def write(self, file_, config:Config, header:dict, manifest:Optional[str]=None) -> None:
+        '''
+        Writes the values of config to the store and the manifest to the opened file_.
+        :param manifest: Path of the manifest to be registered for garbage collection.
+        '''
+        protocol = header.get('protocol', pickle.HIGHEST_PROTOCOL)
+        digests = header.get('digests') or {}
+        with self.locked():
+            blobs = {}
+            for key,value in config.__dict__.items():
+                digest = digests.get(key) or _digest(value)
+                if not self._refresh(digest): # pickled only if not stored yet
+                    self.put(pickle.dumps(value, protocol), digest=digest)
+                blobs[key] = digest
+            if manifest is not None:
+                with open(self.registry, 'a') as registry:
+                    registry.write(f'{os.path.abspath(manifest)}\t{time.time()}\n')
+        header = dict(header, format='manifest', store=self.directory, blobs=blobs)
+        file_.write(_MAGIC+json.dumps(header).encode()+b'\n')
+    
+    def read(self, header:dict, keys:Optional[List[str]]=None) -> Config:
+        if not os.path.isdir(self.directory):
+            raise FileNotFoundError(f'ConfigStore.read: store {self.directory} not found!')
+        blobs = header['blobs']
+        cls = _classME(header)
+        config_ = cls.__new__(cls)
+        for key in (blobs if keys is None else _matchkeys(blobs, keys)):
+            config_.__dict__[key] = pickle.loads(self.get(blobs[key]))
+        return config_
+    
+    def put(self, data:bytes, digest:Optional[str]=None) -> str:
+        '''
+        :param digest: Key of the blob. The default is None which uses the sha256 of data then.
+        '''
+        if digest is None:
+            digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not self._refresh(digest):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomicME(path, 'wb') as file_:
+                file_.write(data)
+        return digest
+    
+    def get(self, digest:str) -> bytes:
+        with open(self._path(digest), 'rb') as file_:
+            return file_.read()
+    
+    @contextlib.contextmanager
+    def locked(self):
+        '''
+        Holds the lock file of the store (blocking).
+        '''
+        with open(os.path.join(self.directory, '.lock'), 'a+b') as file_:
+            if fcntl is not None:
+                fcntl.flock(file_.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                file_.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(file_.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError: # LK_LOCK gives up after 10 seconds
+                        pass
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file_.fileno(), fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    file_.seek(0)
+                    msvcrt.locking(file_.fileno(), msvcrt.LK_UNLCK, 1)
+    
+    def manifests(self) -> List[str]:
+        '''
+        Registered manifests which still exist and still refer to this store.
+        '''
+        return [path for path,stamp in self._registered() if self._refers(path)]
+    
+    def references(self) -> dict:
+        '''
+        :return: {digest : number of references} over all registered manifests.
+        '''
+        counts = {}
+        for path in self.manifests():
+            for digest in readME_header(path)['blobs'].values():
+                counts[digest] = counts.get(digest, 0)+1
+        return counts
+    
+    def gc(self, bequiet:bool=True, grace:Optional[float]=None) -> int:
+        '''
+        Deletes all blobs not referenced by any registered manifest and compacts the registry.
+        :param grace: Minimum age in seconds of a deleted blob, defaults to ConfigStore.GRACE. Registry entries of manifests
+        which do not exist yet are kept for the same time as their writer might still be busy.
+        :return: Number of deleted blobs.
+        '''
+        grace = self.GRACE if grace is None else grace
+        with self.locked():
+            now = time.time()
+            kept = [(path,stamp) for path,stamp in self._registered() if self._refers(path) or (not os.path.exists(path) and now-stamp<grace)]
+            with atomicME(self.registry, 'w') as registry:
+                registry.write(''.join(f'{path}\t{stamp}\n' for path,stamp in kept))
+            
+            referenced = self.references()
+            deleted = 0
+            for digest in self._blobs():
+                if digest in referenced:
+                    continue
+                try:
+                    if now-os.path.getmtime(self._path(digest))<grace:
+                        continue
+                except OSError:
+                    continue
+                if not bequiet:
+                    print(f'ConfigStore.gc: deleting {digest}')
+                deleted += deleteME(self._path(digest), bequiet=bequiet)
+        return deleted
+    
+    def report(self) -> dict:
+        '''
+        :return: Number of manifests and blobs, bytes on disk, bytes the manifests refer to and bytes saved by deduplication.
+        '''
+        sizes = {digest:os.path.getsize(self._path(digest)) for digest in self._blobs()}
+        referenced = sum(sizes.get(digest, 0)*count for digest,count in self.references().items())
+        stored = sum(sizes.values())
+        return {
+            'manifests':len(self.manifests()),
+            'blobs':len(sizes),
+            'stored_bytes':stored,
+            'referenced_bytes':referenced,
+            'saved_bytes':referenced-stored,
+            'ratio':referenced/stored if stored else 1.0
+        }
+    
+    def _path(self, digest:str) -> str:
+        return os.path.join(self.directory, 'blobs', digest[:2], digest)
+    
+    def _refresh(self, digest:str) -> bool:
+        # whether the blob exists, restarting its grace period as it is about to be referenced again
+        try:
+            os.utime(self._path(digest))
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def _blobs(self) -> List[str]:
+        blobs = []
+        for root, dirs, files in os.walk(os.path.join(self.directory, 'blobs')):
+            blobs.extend(file for file in files if not file.endswith('.tmp'))
+        return blobs
+    
+    def _registered(self) -> List[Tuple[str,float]]:
+        # (path, time of registration) of every registered manifest, the latest registration per path
+        if not os.path.exists(self.registry):
+            return []
+        registered = {}
+        with open(self.registry, 'r') as registry:
+            for line in registry:
+                path, _, stamp = line.rstrip('\n').partition('\t')
+                if path.strip():
+                    registered.pop(path, None)
+                    registered[path] = float(stamp) if stamp else 0.0
+        return list(registered.items())
+    
+    def _refers(self, path:str) -> bool:
+        # whether the manifest at path exists and refers to this store, compared as files as the store might be reached by another path
+        if not os.path.isfile(path):
+            return False
+        store = readME_header(path).get('store')
+        if not store:
+            return False
+        try:
+            return os.path.samefile(store, self.directory)
+        except OSError:
+            return os.path.realpath(store)==os.path.realpath(self.directory)
+
+#%% writing
+class _WriteBehind():
+    """
+    Single background thread writing pending saves, keeping only the latest pending write per file.
+    """
+    def __init__(self) -> None:
+        self.pending = {}
+        self.active = None
+        self.errors = []
+        self.condition = threading.Condition()
+        self.thread = None
+    
+    def submit(self, file:str, write:Callable) -> None:
+        with self.condition:
+            self.pending[os.path.abspath(file)] = write
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='ConfigME-writer', daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+    
+    def discard(self, file:str) -> None:
+        '''
+        Drops the pending write of file and waits until a running write of file is finished, e.g. before file is written synchronously.
+        '''
+        path = os.path.abspath(file)
+        with self.condition:
+            self.pending.pop(path, None)
+            self.condition.wait_for(lambda: self.active!=path)
+    
+    def flush(self, timeout:Optional[float]=None) -> None:
+        with self.condition:
+            if not self.condition.wait_for(lambda: not self.pending and self.active is None, timeout):
+                raise TimeoutError(f'flushME: {len(self.pending)} pending writes not finished within {timeout}s!')
+            errors, self.errors = self.errors, []
+        if errors:
+            raise RuntimeError('flushME: background writes failed! '+'; '.join(f'{file}: {e}' for file,e in errors))
+    
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                self.active, write = next(iter(self.pending.items()))
+                del self.pending[self.active]
+            try:
+                write()
+            except Exception as e:
+                with self.condition:
+                    self.errors.append((self.active, e))
+            finally:
+                with self.condition:
+                    self.active = None
+                    self.condition.notify_all()
+
+_WRITER = _WriteBehind()
+atexit.register(lambda: _WRITER.flush())
+
+def flushME(timeout:Optional[float]=None) -> None:
+    '''
+    Waits until all background saves are written and raises if one of them failed.
+    '''
+    _WRITER.flush(timeout=timeout)
+
+@contextlib.contextmanager
+def atomicME(file:str, mode:str='wb'):
+    '''
+    Opens a temporary file next to file which replaces file only after it was completely written and synced to disk.
+    Hence, a crash leaves either the old or the new file but never a truncated one. If file is a symlink, its target is replaced.
+    '''
+    path = os.path.realpath(file)
+    tmp = os.path.join(os.path.dirname(path), f'.{os.path.basename(path)}.{uuid.uuid4().hex}.tmp')
+    try:
+        with open(tmp, mode) as file_:
+            yield file_
+            file_.flush()
+            os.fsync(file_.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        deleteME(tmp, bequiet=True)
+        raise
+    
+    if hasattr(os, 'O_DIRECTORY'): # make the rename itself durable
+        try:
+            fd = os.open(os.path.dirname(path), os.O_RDONLY|os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+#%% remote loading
+class _Download(io.RawIOBase):
+    """
+    Response body which is written to the disk cache while it is read, the cache entry is published once the body is read completely.
+    """
+    def __init__(self, connection, response, path:str, meta:dict) -> None:
+        self.connection = connection
+        self.response = response
+        self.path = path
+        self.meta = meta
+        self.tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+        self.cache = open(self.tmp, 'wb')
+        self.complete = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self.complete:
+            return 0
+        n = self.response.readinto(buffer)
+        if n:
+            self.cache.write(memoryview(buffer)[:n])
+        else:
+            self._publish()
+        return n
+
+    def drain(self) -> str:
+        buffer = bytearray(1<<16)
+        while self.readinto(buffer):
+            pass
+        return self.path
+
+    def close(self) -> None:
+        if not self.complete and not self.cache.closed:
+            self.cache.close()
+            deleteME(self.tmp, bequiet=True)
+            self.connection.close() # unread rest of the body, so the connection cannot be kept alive (reopened with the next request)
+        super().close()
+
+    def _publish(self) -> None:
+        self.cache.close()
+        os.replace(self.tmp, self.path)
+        with atomicME(self.path+'.json', 'w') as file_:
+            json.dump(self.meta, file_)
+        self.complete = True
+
+class _HTTP():
+    """
+    Fetches configs over http(s) with one keep-alive connection per host and thread and a disk cache revalidated by ETag/Last-Modified.
+    """
+    def __init__(self, directory:str, workers:int=8) -> None:
+        self.directory = directory
+        self.workers = workers
+        self.local = threading.local()
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def read(self, url:str, keys:Optional[List[str]]=None) -> Tuple[Config,dict]:
+        path, raw = self.open(url)
+        if raw is None:
+            return _readME_header(path, keys=keys)
+        with io.BufferedReader(raw) as stream: # deserialized while downloading
+            config_, header = _readME_file(stream, keys=keys, drain=raw.drain)
+            raw.drain()
+        return config_, header
+
+    def fetch(self, url:str) -> str:
+        '''
+        :return: Path of the up-to-date copy of url in the cache.
+        '''
+        path, raw = self.open(url)
+        if raw is not None:
+            with raw:
+                raw.drain()
+        return path
+
+    def map(self, function:Callable, urls:List[str]) -> list:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ConfigME-http')
+        return list(self.executor.map(function, urls))
+
+    def open(self, url:str, redirects:int=5) -> Tuple[str,Optional[_Download]]:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest())
+        meta = {}
+        if os.path.isfile(path) and os.path.isfile(path+'.json'):
+            with open(path+'.json', 'r') as file_:
+                meta = json.load(file_)
+
+        headers = {'Accept-Encoding':'identity'}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+        connection, response = self._request(url, headers)
+        if response.status==304:
+            response.read()
+            return path, None
+        if response.status in (301, 302, 303, 307, 308) and redirects>0:
+            response.read()
+            return self.open(urlparse.urljoin(url, response.getheader('Location')), redirects=redirects-1)
+        if response.status!=200:
+            response.read()
+            raise OSError(f'Config: fetching {url} failed with HTTP {response.status} {response.reason}!')
+
+        meta = {'url':url, 'etag':response.getheader('ETag'), 'last_modified':response.getheader('Last-Modified')}
+        return path, _Download(connection, response, path, meta)
+
+    def _request(self, url:str, headers:dict) -> tuple:
+        parts = urlparse.urlsplit(url)
+        target = parts.path if parts.path else '/'
+        if parts.query:
+            target += '?'+parts.query
+        pool = self.local.__dict__.setdefault('connections', {})
+        for attempt in range(2): # a kept-alive connection might have been closed by the server in the meantime
+            connection = pool.get((parts.scheme, parts.netloc))
+            if connection is None:
+                if parts.scheme=='https':
+                    connection = http.client.HTTPSConnection(parts.netloc, timeout=60)
+                else:
+                    connection = http.client.HTTPConnection(parts.netloc, timeout=60)
+                pool[(parts.scheme, parts.netloc)] = connection
+            try:
+                connection.request('GET', target, headers=headers)
+                return connection, connection.getresponse()
+            except (http.client.HTTPException, ConnectionError) as e:
+                connection.close()
+                del pool[(parts.scheme, parts.netloc)]
+                if attempt==1:
+                    raise e
+
+_HTTPCLIENT = _HTTP(os.environ.get('CONFIGME_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'ConfigME')))
+
+def fetchME(url:str) -> str:
+    '''
+    Downloads url into the ConfigME cache (set by the environment variable CONFIGME_CACHE) if not up to date and returns the cached path.
+    '''
+    return _HTTPCLIENT.fetch(url)
+
+#%% catalog
+class ConfigCatalog():
+    """
+    SQLite index of the scalar keys of saved configs in a directory, so queries like
+    catalog.query(lr=('<',1e-3), module_model='models.X') return matching paths without loading any config.
+    """
+    OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'like')
+    
+    def __init__(
+        self,
+        directory: str,
+        database: Optional[str] = None,
+        patterns: Tuple[str,...] = ('*.dill', '*.jsonl')
+    ) -> None:
+        '''
+        :param directory: Directory containing the saved configs.
+        :param database: Path to the SQLite database. The default is None which uses <directory>/.configme_catalog.sqlite then.
+        :param patterns: Filename patterns of the configs to be indexed by scan.
+        '''
+        self.directory = directory
+        self.database = database if database else os.path.join(directory, '.configme_catalog.sqlite')
+        self.patterns = patterns
+        self.connection = sqlite3.connect(self.database, check_same_thread=False) # also used by background saves
+        self._lock = threading.RLock()
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+            CREATE TABLE IF NOT EXISTS entries (path TEXT, key TEXT, value);
+            CREATE INDEX IF NOT EXISTS entries_key_value ON entries (key, value);
+            CREATE INDEX IF NOT EXISTS entries_path ON entries (path);
+        ''')
+    
+    def scan(self, recursive:bool=False, bequiet:bool=True) -> Tuple[int,int]:
+        '''
+        Indexes new and changed configs (by mtime and size) and forgets deleted ones.
+        :return: Number of (re)indexed and removed files.
+        '''
+        found = set()
+        for root, dirs, files in os.walk(self.directory):
+            for pattern in self.patterns:
+                found.update(os.path.abspath(os.path.join(root, file)) for file in fnmatch.filter(files, pattern))
+            if not recursive:
+                break
+        
+        with self._lock:
+            known = dict((path, (mtime_ns, size)) for path, mtime_ns, size in self.connection.execute('SELECT path, mtime_ns, size FROM files'))
+        indexed = 0
+        for path in sorted(found):
+            try:
+                stat = os.stat(path) # the file might have been deleted since walking the directory
+                if known.get(path)==(stat.st_mtime_ns, stat.st_size):
+                    continue
+                self.add(path, commit=False)
+                indexed += 1
+            except Exception as e:
+                if not bequiet:
+                    print(f'ConfigCatalog.scan: {path} could not be indexed! {e}')
+        
+        removed = set(known)-found
+        with self._lock:
+            for path in removed:
+                self._remove(path)
+            self.connection.commit()
+        return indexed, len(removed)
+    
+    def add(self, file:str, config:Optional[Config]=None, commit:bool=True) -> None:
+        '''
+        :param file: Path of the saved config.
+        :param config: The config saved at file. The default is None which loads the file then.
+        '''
+        path = os.path.abspath(file)
+        if config is None:
+            config = Config.LOAD(path, linuxify=False)
+        stat = os.stat(path)
+        
+        entries = [(path, key, _scalar(value)) for key,value in config.__dict__.items() if _scalar(value) is not _MISSING]
+        
+        with self._lock:
+            if not self.connection.in_transaction:
+                self.connection.execute('BEGIN')
+            self.connection.execute('SAVEPOINT add_file') # a failing file must not leave a partial index behind for the next commit
+            try:
+                self._remove(path)
+                self.connection.execute('INSERT INTO files VALUES (?,?,?)', (path, stat.st_mtime_ns, stat.st_size))
+                self.connection.executemany('INSERT INTO entries VALUES (?,?,?)', entries)
+            except BaseException:
+                self.connection.execute('ROLLBACK TO add_file')
+                self.connection.execute('RELEASE add_file')
+                raise
+            self.connection.execute('RELEASE add_file')
+            if commit:
+                self.connection.commit()
+    
+    def query(self, **conditions) -> List[str]:
+        '''
+        Each condition is key=value or key=(operator, value) with operator in ConfigCatalog.OPERATORS or 'in' with a list of values.
+        :return: Sorted paths of the configs fulfilling all conditions.
+        '''
+        sql = 'SELECT path FROM files'
+        clauses = []
+        params = []
+        for key,condition in conditions.items():
+            operator, value = condition if type(condition)==tuple else ('==', condition)
+            if operator=='in':
+                value = [_scalar(value_) for value_ in value]
+                values = [value_ for value_ in value if value_ is not None]
+                match = [f"value IN ({','.join('?'*len(values))})"]+(['value IS NULL'] if None in value else [])
+                clauses.append(f"path IN (SELECT path FROM entries WHERE key=? AND ({' OR '.join(match)}))")
+                params.extend([key]+values)
+            elif operator in self.OPERATORS:
+                operator = {'==':'IS', '!=':'IS NOT'}.get(operator, operator) # also matching None, stored as NULL
+                clauses.append(f'path IN (SELECT path FROM entries WHERE key=? AND value {operator} ?)')
+                params.extend([key, _scalar(value)])
+            else:
+                raise ValueError(f'ConfigCatalog.query: operator {operator} not supported!')
+        if clauses:
+            sql += ' WHERE '+' AND '.join(clauses)
+        with self._lock:
+            return [row[0] for row in self.connection.execute(sql+' ORDER BY path', params)]
+    
+    def close(self) -> None:
+        self.connection.close()
+    
+    def _remove(self, path:str) -> None:
+        self.connection.execute('DELETE FROM files WHERE path=?', (path,))
+        self.connection.execute('DELETE FROM entries WHERE path=?', (path,))
+    
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
 #%% context management
 def parse_args():
     parser = argparse.ArgumentParser()
@@ -883,6 +1984,477 @@ def importME(modules:Union[List[str],str], bequiet:bool=True, setsyspath:bool=Fa
             
     return out
 
+@functools.lru_cache(maxsize=1024)
+def getME_accessor(path:str) -> Callable:
+    '''
+    Compiles a dotted path like 'model_params.optimizer.lr' into an accessor function which is cached per path.
+    '''
+    attribute, *keys = path.split('.')
+    steps = tuple((key, int(key) if key.lstrip('-').isdigit() else None) for key in keys)
+    
+    def accessor(config):
+        out = config.__dict__[attribute]
+        for key, index in steps:
+            if isinstance(out, dict): # string key first, e.g. {'1':5}, integer key only if the string key is missing
+                out = out[key] if index is None or key in out else out[index]
+            elif index is not None:
+                out = out[index]
+            else:
+                out = getattr(out, key)
+        return out
+    return accessor
+
+class _SiblingFinder(importlib.abc.MetaPathFinder):
+    # resolves top-level imports of a python-file config from its directory, consulted only after all regular finders
+    def __init__(self, directory:str) -> None:
+        self.directory = directory
+    
+    def find_spec(self, fullname, path=None, target=None):
+        if path is not None:
+            return None
+        return importlib.machinery.PathFinder.find_spec(fullname, [self.directory])
+
+def loadME_py(file:str, snapshot:bool=False) -> Config:
+    '''
+    Executes a python-file config directly from a compiled-code cache keyed on path and mtime, i.e. without touching sys.path or sys.modules.
+    Modules next to the file can still be imported by it while it is executed (they end up in sys.modules like every imported module).
+    The file has to define a variable named config.
+    :param snapshot: Decider whether to store the resulting config to <file>.dill and load it from there as long as the python-file is unchanged.
+    '''
+    path = os.path.abspath(file)
+    stat = os.stat(path)
+    signature = [stat.st_mtime_ns, stat.st_size]
+    
+    snapfile = path+'.dill'
+    if snapshot and os.path.isfile(snapfile):
+        try:
+            if readME_header(snapfile).get('source')==signature:
+                return _readME(snapfile)
+        except Exception as e:
+            print(f'loadME_py: snapshot {snapfile} not readable, executing {file} instead! {e}')
+    
+    cached = _CODECACHE.get(path)
+    if cached is not None and cached[0]==signature:
+        code = cached[1]
+    else:
+        with open(path, 'rb') as file_:
+            code = compile(file_.read(), path, 'exec')
+        _CODECACHE[path] = (signature, code)
+    
+    namespace = {'__name__':os.path.splitext(os.path.basename(path))[0], '__file__':path, '__builtins__':__builtins__}
+    finder = _SiblingFinder(os.path.dirname(path))
+    sys.meta_path.append(finder)
+    try:
+        exec(code, namespace)
+    finally:
+        sys.meta_path.remove(finder)
+    config_ = namespace.get('config')
+    if config_ is None:
+        raise ImportError(f'loadME_py: {file} does not define a config!')
+    
+    if snapshot:
+        try:
+            with atomicME(snapfile, 'wb') as file_:
+                _writeME(file_, config_, config_._header(source=signature))
+        except Exception as e:
+            print(f'loadME_py: snapshot of {file} failed! {e}')
+    return config_
+
+def readME_header(file:str) -> dict:
+    '''
+    Reads the header of a saved config without deserializing it. Configs saved without header give an empty dictionary.
+    '''
+    with open(file, 'rb') as file_:
+        return _readME_magic(file_)[0]
+
+def fingerprintME(file:str, ignore_volatile:bool=False, ignore:Optional[List[str]]=None) -> Optional[str]:
+    '''
+    Fingerprint of a saved config computed from its header only. Returns None if the file has no digests stored.
+    '''
+    header = readME_header(file)
+    if 'digests' not in header:
+        return None
+    return _merkle(header['digests'], _ignored(ignore_volatile, ignore))
+
+def _rewrite_args(contents:List[str], attributes:List[str], keys:List[list], values:List[list], header:bool=False) -> List[str]:
+    '''
+    Replaces the first non-comment line mentioning config.<attribute>, config["<attribute>"] or config['<attribute>'] by the parameter block of each attribute.
+    All lines are indexed once and the blocks are spliced in a single pass. If two attributes share a line or a block would itself be matched
+    by an attribute processed later, the attributes are processed one after another to keep the result of the sequential rewrite.
+    :param header: Decider whether the blocks shall replace the first line and carry the ConfigME header (for parse_args with a file given as mode).
+    '''
+    blocks = [_args_block(attribute, key, value, header) for attribute,key,value in zip(attributes,keys,values)]
+    attributes = attributes[:len(blocks)]
+    if header: # every attribute replaces the first line, so only the head of the file is affected
+        head = contents[:1]
+        for block in blocks:
+            if head:
+                head[0:1] = block
+        return head+contents[1:]
+
+    for j,block in enumerate(blocks):
+        later = set(attributes[j+1:])
+        if later and any(not content.strip().startswith('#') and _args_matches(content, later) for content in block):
+            return _rewrite_args_sequential(contents, attributes, blocks)
+
+    if len(attributes)!=len(set(attributes)):
+        return _rewrite_args_sequential(contents, attributes, blocks)
+
+    pending = set(attributes)
+    lengths = tuple(sorted(set(len(attribute) for attribute in attributes)))
+    targets = {}
+    for i, content in enumerate(contents):
+        if not pending:
+            break
+        if 'config' not in content or content.strip().startswith('#'):
+            continue
+        matches = _args_matches(content, pending, lengths)
+        if len(matches)>1:
+            return _rewrite_args_sequential(contents, attributes, blocks)
+        for attribute in matches:
+            pending.discard(attribute)
+            targets[i] = blocks[attributes.index(attribute)]
+
+    out = []
+    for i, content in enumerate(contents):
+        if i in targets:
+            out.extend(targets[i])
+        else:
+            out.append(content)
+    return out
+
+def _rewrite_args_sequential(contents:List[str], attributes:List[str], blocks:List[List[str]]) -> List[str]:
+    contents = list(contents)
+    for attribute,block in zip(attributes,blocks):
+        for i, content in enumerate(contents):
+            if not content.strip().startswith('#') and _args_matches(content, {attribute}):
+                contents[i:i+1] = block
+                break
+    return contents
+
+def _args_block(attribute:str, key:list, value:list, header:bool=False) -> List[str]:
+    # original line is replaced by a dictionary definition relying on the queried arguments, preceded by the arguments and their default values
+    params_string = ''.join(['{\n']+[f"""\t"{key_}":config['{'_'.join([attribute,key_])}'],\n""" for key_ in key]+['}'])
+    block = ['### Made with ConfigME by Michael Engel! ###\n'] if header else []
+    block.append(f"# params for {attribute}\n")
+    for key_,value_ in list(zip(key[::-1],value[::-1]))[::-1]:
+        block.append(f"config.{'_'.join([attribute,key_])} = {value_ if value_=='' else str(value_)+' # think of changing this default value!'}\n")
+    block.append(f"\nconfig.{attribute} = {params_string}\n")
+    block.append("\n")
+    return block
+
+_ARGS_ACCESSOR = re.compile(r"(?=config(\.|\[\"|\[\')([\w\{\}\'\"]*))") # lookahead as occurrences may overlap
+
+def _args_matches(content:str, attributes:set, lengths:Optional[Tuple[int,...]]=None) -> List[str]:
+    # attributes occurring as config.<attribute> (also as prefix, e.g. of config.<attribute>_lr), config["<attribute>"] or config['<attribute>']
+    # lengths: lengths of the attributes to be tried as prefixes, all prefixes by default
+    matches = []
+    for match in _ARGS_ACCESSOR.finditer(content):
+        accessor, run = match.groups()
+        rest = content[match.start()+len('config')+len(accessor):]
+        for k in (range(len(run)+1) if lengths is None else lengths):
+            if k>len(run):
+                break
+            candidate = run[:k]
+            if candidate in attributes and candidate not in matches and (accessor=='.' or rest.startswith(accessor[1]+']', k)):
+                matches.append(candidate)
+    return matches
+
+def _readME(file:str, keys:Optional[List[str]]=None) -> Config:
+    return _readME_header(file, keys=keys)[0]
+
+def _readME_header(file:str, keys:Optional[List[str]]=None) -> Tuple[Config,dict]:
+    if _isurl(file):
+        return _HTTPCLIENT.read(file, keys=keys)
+    with open(file, 'rb') as file_:
+        return _readME_file(file_, keys=keys)
+
+def _readMEs(files:List[str]) -> List[Config]:
+    # remote files are fetched in parallel
+    if len(files)>1 and any(_isurl(file) for file in files):
+        return _HTTPCLIENT.map(_readME, files)
+    return [_readME(file) for file in files]
+
+def _readME_file(file_, keys:Optional[List[str]]=None, drain:Optional[Callable]=None) -> Tuple[Config,dict]:
+    '''
+    :param drain: For streams which are not seekable, function downloading the rest and returning the local path for formats which need seeking.
+    :return: Config and header of the file (empty for configs saved without header).
+    '''
+    header, magic = _readME_magic(file_)
+    if magic in (_MAGIC, _MAGIC_JSONL):
+        if header.get('format')=='jsonl':
+            if drain is None:
+                return _readME_jsonl(file_, keys=keys, cls=_classME(header)), header
+            with open(drain(), 'rb') as local_:
+                return _readME_jsonl(local_, keys=keys, cls=_classME(header)), header
+        if header.get('format')=='manifest':
+            return ConfigStore(header['store'], create=False).read(header, keys=keys), header
+    elif file_.seekable():
+        file_.seek(0)
+    else:
+        file_ = io.BufferedReader(_Prefixed(magic, file_))
+    config_ = pickle.load(file_)
+    
+    if keys is not None:
+        config_.__dict__ = {key:config_.__dict__[key] for key in _matchkeys(config_.__dict__, keys)}
+    return config_, header
+
+class _Prefixed(io.RawIOBase):
+    # stream with already read bytes put back in front
+    def __init__(self, prefix:bytes, file_) -> None:
+        self.prefix = prefix
+        self.file_ = file_
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self.prefix:
+            n = min(len(buffer), len(self.prefix))
+            buffer[:n] = self.prefix[:n]
+            self.prefix = self.prefix[n:]
+            return n
+        return self.file_.readinto(buffer)
+
+def _isurl(file) -> bool:
+    return type(file)==str and file.split('://')[0] in ('http', 'https')
+
+def _writeME(file_, config:Config, header:dict) -> None:
+    file_.write(_MAGIC+json.dumps(header).encode()+b'\n')
+    pickle.dump(config, file_, header.get('protocol', pickle.HIGHEST_PROTOCOL))
+
+# text format: header line, one JSON record per key, JSON footer with the record index {key : [offset, length]} and a fixed-width pointer to the footer
+_FOOTER = b'{"index_offset": "%020d"}\n'
+_FOOTERSIZE = len(_FOOTER % 0)
+
+def _writeME_jsonl(file_, config:Config, header:dict) -> None:
+    # every line is a JSON record: the header, one record per key, the index of the records and the fixed-width offset of the index
+    header = dict(header, format='jsonl')
+    file_.write(json.dumps({'ConfigME':header}).encode()+b'\n')
+    index = {}
+    for key,value in config.__dict__.items():
+        if _jsonable(value):
+            record = {'key':key, 'value':value}
+        else:
+            record = {'key':key, 'dill':base64.b64encode(pickle.dumps(value, header.get('protocol', pickle.HIGHEST_PROTOCOL))).decode('ascii')}
+        line = json.dumps(record, allow_nan=False).encode()+b'\n'
+        index[key] = [file_.tell(), len(line)]
+        file_.write(line)
+    footer = file_.tell()
+    file_.write(json.dumps({'index':index}).encode()+b'\n')
+    file_.write(_FOOTER % footer)
+
+def _readME_magic(file_) -> Tuple[dict,bytes]:
+    # header of a file starting with either header line and the bytes read, an empty header for files without
+    magic = file_.read(len(_MAGIC))
+    if magic==_MAGIC:
+        return json.loads(file_.readline()), magic
+    if magic==_MAGIC_JSONL:
+        return json.loads(magic+file_.readline())['ConfigME'], magic
+    return {}, magic
+
+def _readME_jsonl(file_, keys:Optional[List[str]]=None, cls:type=Config) -> Config:
+    file_.seek(-_FOOTERSIZE, os.SEEK_END)
+    file_.seek(int(json.loads(file_.read())['index_offset']))
+    index = json.loads(file_.readline())['index']
+    
+    config_ = cls.__new__(cls)
+    for key in (index if keys is None else _matchkeys(index, keys)):
+        offset, length = index[key]
+        file_.seek(offset)
+        record = json.loads(file_.read(length))
+        if 'value' in record:
+            config_.__dict__[key] = record['value']
+        else:
+            config_.__dict__[key] = pickle.loads(base64.b64decode(record['dill']))
+    return config_
+
+def _classME(header:dict) -> type:
+    # class of the saved config given as 'module:qualname' in the header, Config if it cannot be resolved
+    name = header.get('class')
+    if not name:
+        return Config
+    module, qualname = name.split(':')
+    try:
+        cls = il.import_module(module)
+        for attr_ in qualname.split('.'):
+            cls = getattr(cls, attr_)
+    except Exception as e:
+        print(f'Config: class {name} of the saved config not found, loading as Config instead! {e}')
+        return Config
+    if not (isinstance(cls, type) and issubclass(cls, Config)):
+        return Config
+    return cls
+
+def _jsonable(value) -> bool:
+    # only types which survive a JSON round trip unchanged
+    if type(value)==float:
+        return math.isfinite(value) # NaN and inf are no valid JSON
+    if value is None or type(value) in (bool, int, str):
+        return True
+    if type(value)==list:
+        return all(_jsonable(value_) for value_ in value)
+    if type(value)==dict:
+        return all(type(key)==str and _jsonable(value_) for key,value_ in value.items())
+    return False
+
+def _matchkeys(available, keys:List[str]) -> List[str]:
+    matched = []
+    for key in keys:
+        if any(char in key for char in '*?['):
+            matched.extend(fnmatch.filter(available, key))
+        elif key in available:
+            matched.append(key)
+    return list(dict.fromkeys(matched))
+
+def _ignored(ignore_volatile:bool, ignore:Optional[List[str]]) -> set:
+    ignored = set(ignore) if ignore else set()
+    if ignore_volatile:
+        ignored.update(VOLATILE_KEYS)
+    return ignored
+
+def _merkle(digests:dict, ignore:set=set()) -> str:
+    root = hashlib.sha256()
+    for key in sorted(digests):
+        if key not in ignore:
+            root.update(f'{key}\0{digests[key]}\n'.encode())
+    return root.hexdigest()
+
+def _immutable(value) -> bool:
+    # values which cannot change in place, so their cached digest stays valid
+    if value is None or type(value) in (bool, int, float, complex, str, bytes) or isinstance(value, PurePath):
+        return True
+    if type(value) in (tuple, frozenset):
+        return all(_immutable(value_) for value_ in value)
+    return False
+
+def _digest(value) -> str:
+    hasher = hashlib.sha256()
+    _feed(hasher, value)
+    return hasher.hexdigest()
+
+def _feed(hasher, value, seen:Optional[set]=None) -> None:
+    # canonical, type-tagged and length-prefixed encoding so equal contents give equal digests independent of e.g. dict order or hash randomization
+    if seen is None:
+        seen = set()
+    if type(value) in _PRIMITIVES:
+        data = repr(value).encode()
+    elif isinstance(value, PurePath):
+        data = str(value).encode()
+    elif isinstance(value, np.ndarray) and value.dtype!=object:
+        data = f'{value.dtype.str}{value.shape}'.encode()+np.ascontiguousarray(value).tobytes()
+    elif id(value) in seen: # reference cycle
+        data = b'cycle'
+    elif type(value) in (list, tuple) or isinstance(value, np.ndarray):
+        hasher.update(f'{type(value).__name__}[{len(value)}]'.encode())
+        if all(type(value_) in _PRIMITIVES for value_ in value): # flat containers in one go by their repr, which is unambiguous for primitives
+            _feed_flat(hasher, value if type(value) in (list, tuple) else list(value))
+            return
+        seen.add(id(value))
+        for value_ in value:
+            _feed(hasher, value_, seen)
+        seen.discard(id(value))
+        return
+    elif type(value)==dict:
+        hasher.update(f'dict[{len(value)}]'.encode())
+        if all(type(key) is str for key in value) and all(type(value_) in _PRIMITIVES for value_ in value.values()):
+            _feed_flat(hasher, sorted(value.items()))
+            return
+        keys = sorted(value, key=_sortkey)
+        seen.add(id(value))
+        for key in keys:
+            _feed(hasher, key, seen)
+            _feed(hasher, value[key], seen)
+        seen.discard(id(value))
+        return
+    elif type(value) in (set, frozenset):
+        data = ','.join(sorted(_digest(value_) for value_ in value)).encode()
+    elif isinstance(value, (dict, list, tuple, set, frozenset)):
+        # subclasses as containers tagged by their type, OrderedDict in order as its equality depends on it, plus their instance state if any
+        hasher.update(f'{type(value).__module__}.{type(value).__qualname__}'.encode())
+        seen.add(id(value))
+        if isinstance(value, dict):
+            hasher.update(f'[{len(value)}]'.encode())
+            for key in (value if isinstance(value, collections.OrderedDict) else sorted(value, key=_sortkey)):
+                _feed(hasher, key, seen)
+                _feed(hasher, value[key], seen)
+        elif isinstance(value, (set, frozenset)):
+            _feed(hasher, frozenset(value), seen)
+        else:
+            _feed(hasher, list(value), seen)
+        if getattr(value, '__dict__', None):
+            _feed(hasher, vars(value), seen)
+        seen.discard(id(value))
+        return
+    elif hasattr(value, '__dict__') and not callable(value) and not isinstance(value, types.ModuleType):
+        # plain objects by their state instead of their pickle, which depends on e.g. dict insertion order
+        hasher.update(f'{type(value).__module__}.{type(value).__qualname__}'.encode())
+        seen.add(id(value))
+        _feed(hasher, value.__getstate__() if hasattr(value, '__getstate__') else vars(value), seen)
+        seen.discard(id(value))
+        return
+    else: # e.g. functions, only stable as long as their pickle is
+        data = pickle.dumps(value, 4)
+    hasher.update(f'{type(value).__name__}:{len(data)}:'.encode())
+    hasher.update(data)
+
+_PRIMITIVES = frozenset((type(None), bool, int, float, complex, str, bytes))
+
+def _feed_flat(hasher, value) -> None:
+    data = repr(value).encode()
+    hasher.update(f'flat:{len(data)}:'.encode())
+    hasher.update(data)
+
+def _sortkey(key) -> str:
+    return repr(key) if key is None or type(key) in (bool, int, float, complex, str, bytes) else _digest(key)
+
+def _linuxify(value, windows:bool=False):
+    # value with forward slashes, the very same object if nothing has to be changed
+    # windows: whether to convert Windows paths to PurePosixPath (changing their type, so only for saved copies)
+    if type(value)==str:
+        return value.replace('\\','/') if '\\' in value else value
+    if isinstance(value, PureWindowsPath): # WindowsPath cannot be unpickled on other platforms
+        return PurePosixPath(value.as_posix()) if windows else value
+    if isinstance(value, PurePath):
+        return type(value)(str(value).replace('\\','/')) if '\\' in str(value) else value
+    if type(value) in (list, tuple):
+        values = [_linuxify(value_, windows) for value_ in value]
+        if all(value_ is valueold for value_,valueold in zip(values,value)):
+            return value
+        return type(value)(values)
+    return value
+
+def _scalar(value):
+    # values storable in the catalog, _MISSING otherwise
+    if type(value)==int or isinstance(value, np.integer):
+        value = int(value)
+        return value if -2**63<=value<2**63 else _MISSING # SQLite integers are 64 bit
+    if value is None or type(value) in (bool, float, str):
+        return value
+    if isinstance(value, PurePath):
+        return str(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return _MISSING
+
+def _equal(a, b) -> bool:
+    if a is b:
+        return True
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return type(a)==type(b) and np.array_equal(a, b)
+    try:
+        return bool(a==b)
+    except Exception:
+        return False
+
+def _flatten(value, prefix:str) -> dict:
+    if isinstance(value, dict) and len(value)>0:
+        flat = {}
+        for key,value_ in value.items():
+            flat.update(_flatten(value_, f'{prefix}.{key}'))
+        return flat
+    return {prefix:value}
+
 def getME_args(fun,key='args',ignoreself=True):
     # inspect function
     if inspect.isclass(fun):
@@ -1 +1 @@
-from ConfigME import Config, importME
+from ConfigME import Config, ConfigWatcher, ConfigCatalog, ConfigSnapshot, ConfigStore, importME, loadME_py, fetchME, fingerprintME, readME_header, atomicME, flushME
\ No newline at end of file
@@ -0,0 +1,59 @@
+### bench_parse_args.py ###
+'''
+Benchmark of the rewrite done by Config.parse_args: the original loop (one scan of the file and list inserts per attribute)
+against the single-pass _rewrite_args of ConfigME, on generated configs of some thousand lines.
+Both results are compared, so the script also fails if the rewrite changes the output.
+Usage: python bench/bench_parse_args.py [lines] [attributes]
+'''
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ConfigME import _rewrite_args
+
+def legacy(contents, attributes, keys, values, mode):
+    # loop of Config.parse_args before the single-pass rewrite
+    contents = list(contents)
+    for idx,attributekeyvalue in enumerate(zip(attributes,keys,values)):
+        attribute, key, value = attributekeyvalue
+        for i, content in enumerate(contents):
+            if ((f'config.{attribute}' in content or f'config["{attribute}"]' in content or f"config['{attribute}']" in content) and not content.strip().startswith('#')) or type(mode)==str:
+                params_string = ''.join(['{\n']+[f"""\t"{key_}":config['{'_'.join([attribute,key_])}'],\n""" for key_ in key]+['}'])
+                contents[i] = f"\nconfig.{attribute} = {params_string}\n"
+                contents.insert(i+1, "\n")
+                for key_,value_ in zip(key[::-1],value[::-1]):
+                    contents.insert(i, f"config.{'_'.join([attribute,key_])} = {value_ if value_=='' else str(value_)+' # think of changing this default value!'}\n")
+                contents.insert(i,f"# params for {attribute}\n")
+                if type(mode)==str:
+                    contents.insert(i,'### Made with ConfigME by Michael Engel! ###\n')
+                break
+    return contents
+
+def generate(lines:int, attributes:int):
+    names = [f'module{i}' for i in range(attributes)]
+    contents = []
+    for i in range(lines):
+        if i%(lines//attributes)==0 and i//(lines//attributes)<attributes:
+            contents.append(f'config.{names[i//(lines//attributes)]} = None\n')
+        elif i%7==0:
+            contents.append(f'# config.{names[i%attributes]} is set below\n')
+        else:
+            contents.append(f'config.value{i} = {i}\n')
+    keys = [['lr', 'epochs', 'batch_size'] for name in names]
+    values = [[1e-3, 10, ''] for name in names]
+    return contents, names, keys, values
+
+def bench(lines:int, attributes:int, repeat:int=5) -> None:
+    contents, names, keys, values = generate(lines, attributes)
+    assert ''.join(legacy(contents, names, keys, values, None))==''.join(_rewrite_args(contents, names, keys, values)), 'results differ!'
+    old = min(timeit.repeat(lambda: legacy(contents, names, keys, values, None), number=1, repeat=repeat))
+    new = min(timeit.repeat(lambda: _rewrite_args(contents, names, keys, values), number=1, repeat=repeat))
+    print(f'{lines:>6} lines {attributes:>4} attributes: legacy {old*1e3:8.2f} ms, single pass {new*1e3:8.2f} ms, speedup {old/new:5.1f}x')
+
+if __name__=='__main__':
+    if len(sys.argv)>2:
+        bench(int(sys.argv[1]), int(sys.argv[2]))
+    else:
+        for lines,attributes in ((1000,20), (2000,50), (5000,100), (10000,200)):
+            bench(lines, attributes)
@@ -0,0 +1,35 @@
+### test_catalog.py ###
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ConfigME import Config, ConfigCatalog
+
+def test_query_none_and_big_ints(tmp_path):
+    catalog = ConfigCatalog(str(tmp_path))
+    for name,seed in (('a',None), ('b',2**70), ('c',3)):
+        config = Config(name)
+        config.seed = seed
+        config.lr = 0.1
+        config.save(str(tmp_path/f'{name}.dill'), bequiet=True, catalog=catalog)
+    paths = lambda paths: [os.path.basename(path) for path in paths]
+    assert paths(catalog.query(seed=None))==['a.dill']
+    assert paths(catalog.query(seed=('!=', None)))==['c.dill'] # 2**70 does not fit into SQLite and is not indexed
+    assert paths(catalog.query(seed=('in', [None, 3])))==['a.dill', 'c.dill']
+    assert paths(catalog.query(lr=0.1))==['a.dill', 'b.dill', 'c.dill']
+
+def test_failed_add_leaves_no_partial_index(tmp_path):
+    catalog = ConfigCatalog(str(tmp_path))
+    config = Config('a')
+    config.lr = 0.2
+    config.save(str(tmp_path/'a.dill'), bequiet=True)
+    catalog.connection.execute("CREATE TEMP TRIGGER fail BEFORE INSERT ON entries WHEN NEW.key='lr' BEGIN SELECT RAISE(ABORT, 'fail'); END")
+    try:
+        catalog.add(str(tmp_path/'a.dill'))
+    except Exception:
+        pass
+    catalog.connection.commit()
+    assert len(catalog)==0
+    catalog.connection.execute('DROP TRIGGER fail')
+    assert catalog.scan()==(1, 0)
+    assert catalog.query(lr=0.2)==[str(tmp_path/'a.dill')]
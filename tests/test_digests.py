@@ -0,0 +1,34 @@
+### test_digests.py ###
+import os
+import sys
+from collections import OrderedDict, namedtuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ConfigME import Config, _digest
+
+class D(dict):
+    pass
+
+class L(list):
+    pass
+
+P = namedtuple('P', 'x y')
+
+def test_container_subclasses_hash_their_contents():
+    assert _digest(OrderedDict(a=1))!=_digest(OrderedDict(b=2))
+    assert _digest(D(a=1))!=_digest(D(a=2))
+    assert _digest(L([1]))!=_digest(L([2]))
+    assert _digest(P(1,2))!=_digest(P(1,3))
+
+def test_container_subclasses_are_tagged_by_type():
+    assert _digest(D(a=1))!=_digest({'a':1})
+    assert _digest(L([1]))!=_digest([1])
+    assert _digest(D(a=1, b=2))==_digest(D(b=2, a=1))
+    assert _digest(OrderedDict(a=1, b=2))!=_digest(OrderedDict(b=2, a=1))
+
+def test_fingerprint_tells_configs_apart():
+    a, b = Config('run'), Config('run')
+    a.params, b.params = OrderedDict(lr=1e-3), OrderedDict(lr=1e-2)
+    assert not a.same_as(b)
+    b.params = OrderedDict(lr=1e-3)
+    assert a.same_as(b)
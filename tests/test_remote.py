@@ -0,0 +1,90 @@
+### test_remote.py ###
+import os
+import sys
+import hashlib
+import threading
+import http.server
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ConfigME
+from ConfigME import Config, fetchME
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    # serves the files of server.directory with an ETag and answers If-None-Match with 304
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        path = os.path.join(self.server.directory, self.path.split('?')[0].lstrip('/'))
+        if not os.path.isfile(path):
+            self._send(404, b'')
+            return
+        with open(path, 'rb') as file_:
+            data = file_.read()
+        etag = '"'+hashlib.sha256(data).hexdigest()+'"'
+        if self.headers.get('If-None-Match')==etag:
+            self._send(304, b'', etag)
+        else:
+            self._send(200, data, etag)
+    
+    def _send(self, status, data, etag=None):
+        self.server.log.append((self.path, status))
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(ConfigME._HTTPCLIENT, 'directory', str(tmp_path/'cache'))
+    os.makedirs(tmp_path/'served')
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.directory = str(tmp_path/'served')
+    server.log = []
+    server.url = f'http://127.0.0.1:{server.server_port}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def _serve(server, name, **values):
+    config = Config(name)
+    for key,value in values.items():
+        setattr(config, key, value)
+    config.save(os.path.join(server.directory, name), bequiet=True)
+    return f'{server.url}/{name}'
+
+def test_revalidation_by_etag(server):
+    url = _serve(server, 'a.dill', lr=1e-3)
+    assert Config.LOAD(url).lr==1e-3
+    assert Config.LOAD(url).lr==1e-3
+    assert [status for path,status in server.log]==[200, 304]
+    
+    _serve(server, 'a.dill', lr=1e-2)
+    assert Config.LOAD(url).lr==1e-2
+    assert server.log[-1][1]==200
+
+def test_jsonl_key_selection(server):
+    url = _serve(server, 'b.jsonl', lr=1e-3, epochs=10, dir_data='data')
+    config = Config.LOAD(url, keys=['lr', 'dir_*'])
+    assert config.__dict__=={'lr':1e-3, 'dir_data':'data'}
+    assert fetchME(url)==os.path.join(ConfigME._HTTPCLIENT.directory, hashlib.sha256(url.encode()).hexdigest())
+
+def test_parallel_join(server):
+    urls = [_serve(server, f'c{i}.dill', **{f'key{i}':i, 'shared':i}) for i in range(6)]
+    config = Config('joined')
+    config.join(urls, priority='new')
+    assert all(getattr(config, f'key{i}')==i for i in range(6))
+    assert config.shared==5
+    assert config.name=='c5.dill'
+
+def test_missing_file(server):
+    with pytest.raises(OSError, match='HTTP 404'):
+        Config.LOAD(f'{server.url}/missing.dill')
+    assert os.listdir(ConfigME._HTTPCLIENT.directory)==[] # nothing cached
@@ -0,0 +1,26 @@
+### test_save.py ###
+import os
+import sys
+from pathlib import PurePosixPath, PureWindowsPath
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ConfigME import Config, readME_header
+
+def test_normalized_copy(tmp_path):
+    config = Config('run')
+    config.dir_data = PureWindowsPath('C:\\data\\train')
+    config.file_list = [PureWindowsPath('a\\b'), 'c\\d']
+    file = config.save(str(tmp_path/'config.dill'), bequiet=True)
+    assert type(config.dir_data)==PureWindowsPath and config.file_list[1]=='c\\d' # the config itself is unchanged
+    
+    loaded = Config.LOAD(file)
+    assert readME_header(file)['normalized']
+    assert loaded.dir_data==PurePosixPath('C:/data/train')
+    assert loaded.file_list==[PurePosixPath('a/b'), 'c/d']
+
+def test_save_through_symlink(tmp_path):
+    config = Config('run')
+    os.symlink(tmp_path/'target.dill', tmp_path/'link.dill')
+    config.save(str(tmp_path/'link.dill'), bequiet=True)
+    assert os.path.islink(tmp_path/'link.dill')
+    assert Config.LOAD(str(tmp_path/'target.dill')).name=='run'
@@ -0,0 +1,33 @@
+### test_snapshots.py ###
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ConfigME import Config
+
+def test_evicted_snapshots_stay_valid():
+    random.seed(0)
+    config = Config('run')
+    taken = []
+    for i in range(200):
+        key = f'key{random.randrange(8)}'
+        if random.random()<0.6:
+            setattr(config, key, i)
+        elif hasattr(config, key):
+            delattr(config, key)
+        taken.append((config.snapshot(maxlen=3), dict(config.__dict__)))
+    assert len(config.history())==3
+    for snapshot,state in taken:
+        assert snapshot.state()==state
+        assert all(snapshot[key]==value for key,value in state.items())
+
+def test_restore_and_diff():
+    config = Config('run')
+    config.lr = 1e-3
+    config.snapshot()
+    config.lr = 1e-2
+    del config.name
+    assert config.diff()=={'lr':(1e-3, 1e-2), 'name':('run', None)}
+    config.restore()
+    assert config.lr==1e-3 and config.name=='run'